@@ -4,12 +4,9 @@ import os
 import logging
 import asyncio
 from dotenv import load_dotenv
-from system.platforms.telegram import TelegramBot
-from system.platforms.console import ConsoleHandler
 from system.ai.context import LLMContext
 from system.ai.memory import MemoryManager
-import re
-from typing import Tuple, List
+__all__ = ['main']
 
 # Configure logging
 logging.basicConfig(
@@ -45,19 +42,25 @@ async def main():
                 break
             print("Invalid choice. Please enter 1 for Telegram or 2 for Console.")
         
-        if choice == '1':
-            # Check for Telegram token
-            if not os.getenv('TELEGRAM_BOT_TOKEN'):
-                print("Error: TELEGRAM_BOT_TOKEN not found in environment variables.")
-                return
-            
-            # Start Telegram bot
-            bot = TelegramBot(llm_context, memory_manager)
-            await bot.start()
-        else:
-            # Start Console interface
-            console = ConsoleHandler(llm_context, memory_manager)
-            await console.start()
+        try:
+            if choice == '1':
+                # Check for Telegram token
+                if not os.getenv('TELEGRAM_BOT_TOKEN'):
+                    print("Error: TELEGRAM_BOT_TOKEN not found in environment variables.")
+                    return
+
+                # Start Telegram bot (imported lazily so the console path never
+                # pays for aiogram's import tree, and vice versa)
+                from system.platforms.telegram import TelegramBot
+                bot = TelegramBot(llm_context, memory_manager)
+                await bot.start()
+            else:
+                # Start Console interface
+                from system.platforms.console import ConsoleHandler
+                console = ConsoleHandler(llm_context, memory_manager)
+                await console.start()
+        finally:
+            await llm_context.close()
         
     except KeyboardInterrupt:
         print("\nShutting down...")
@@ -65,21 +68,5 @@ async def main():
         logger.error(f"Error running GLAD: {e}")
         logger.exception("Full exception details:")
 
-async def process_response(self, response: str) -> Tuple[str, List[str]]:
-    processed_response = response
-    memory_entries = []
-    
-    # First check if there are any uncompleted tool executions
-    tool_matches = re.finditer(r'<(python|terminal|perplexity)>(.*?)</(python|terminal|perplexity)>', processed_response, re.DOTALL)
-    for match in tool_matches:
-        if not re.search(r'<result>.*?</result>', processed_response[match.end():]):
-            # Tool execution result not found, process it
-            result = await self.process_tool_execution(match.group(0))
-            processed_response = (
-                processed_response[:match.end()] + 
-                f"\n<result>{result}</result>\n" + 
-                processed_response[match.end():]
-            )
-
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -9,6 +9,9 @@ setup(
         'aiogram',
         'openai',
         'python-dotenv',
-        'aiohttp'
+        'aiohttp',
+        'orjson',
+        'httpx[http2]',
+        'aiosqlite'
     ],
 ) 
\ No newline at end of file
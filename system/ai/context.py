@@ -1,42 +1,108 @@
 import os
-import json
+import sys
 import logging
-from anthropic import Anthropic
+from collections import deque
 from typing import Tuple, List, Optional, Dict
-from .xml_processor import XMLProcessor
+from ..config import load_config
+from .xml_processor import XMLProcessor, compile_tag_pattern
 from datetime import datetime
 import re
 import asyncio
 
+# Configure raw token-stream logging once per process. basicConfig is only
+# honored on the first call, so the guard keeps repeated imports and instance
+# constructions from walking the handler list under the logging lock.
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='\033[90m%(asctime)s\033[0m - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+
 logger = logging.getLogger(__name__)
 
+# Per-chunk budget for the streaming response; a stream that stops producing
+# deltas for this long is treated as stalled instead of hanging the turn.
+_STREAM_CHUNK_TIMEOUT = 30
+
+# Timestamp format for user-visible message stamps, bound once at import.
+_TS_FMT = '%Y-%m-%d %H:%M:%S'
+
+# Context-window banner, built once instead of re-deriving the separator
+# strings on every turn.
+_HEADER = "\n" + "=" * 80 + "\nCONTEXT WINDOW:\n" + "=" * 80 + "\n\n"
+
+# Pre-compiled tag patterns shared by every get_response call. Compiling once at
+# module scope keeps the hot streaming loop inside the C-level matcher instead of
+# paying the regex-cache lookup (or a recompile) on each delta. The patterns come
+# from compile_tag_pattern so a missing closer cannot trigger quadratic
+# backtracking over a partially streamed buffer.
+_THINKING_RE = compile_tag_pattern('thinking')
+_TOOL_RES = {
+    tool: compile_tag_pattern(tool)
+    for tool in ('python', 'terminal', 'perplexity')
+}
+_RESULT_RE = compile_tag_pattern('result')
+
+# Literal opener/closer strings for the hot containment checks in the stream
+# loop — plain str.find on fixed needles beats both regex alternation and
+# rebuilding f-string tags on every delta.
+_TOOL_TAGS = {
+    tool: (f'<{tool}>', f'</{tool}>')
+    for tool in ('python', 'terminal', 'perplexity')
+}
+
+# Static prompt documentation for each tool, keyed by config name; the prompt
+# builder just filters this by what is enabled instead of rebuilding tuples.
+_TOOL_DOCS = {
+    'python': ("Python Code Execution", "<python>\n# Your Python code here\n</python>\n<result>Tool output appears here</result>"),
+    'terminal': ("Terminal Commands", "<terminal>\n# Your command here\n</terminal>\n<result>Tool output appears here</result>"),
+    'perplexity': ("Perplexity Search", "<perplexity>\n# Your search query here\n</perplexity>\n<result>Tool output appears here</result>"),
+}
+
 class LLMContext:
     def __init__(self):
-        self.client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-        self.current_context = []
+        # Imported here rather than at module scope so importing this module
+        # stays cheap for code paths that never construct a client
+        import httpx
+        from anthropic import AsyncAnthropic
+
+        # Long-lived pooled connection with keep-alive and HTTP/2 so repeated
+        # messages.create calls (retry loop, tool-driven regenerations) reuse
+        # the TLS session instead of paying a handshake per call.
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        self.client = AsyncAnthropic(
+            api_key=os.getenv('ANTHROPIC_API_KEY'),
+            http_client=self._http
+        )
+        self.current_context = deque()
+        self._context_bytes = 0  # Running size of all entries, kept in sync below
+        # First exchange is pinned as an "attention sink" that trimming never
+        # evicts — keeping the conversation-opening turn stabilizes long
+        # dialogues the same way StreamingLLM keeps its initial tokens.
+        self._sink = []
         self.max_context_length = 4000
         
-        # Load config
-        with open('config/config.json', 'r') as f:
-            self.config = json.load(f)['system']
+        # Load config (cached; repeated constructions reuse the parsed dict)
+        self.config = load_config()
         
         self.xml_processor = XMLProcessor()
-        
-        # Set up raw token stream logging with colors
-        logging.basicConfig(
-            level=logging.INFO,
-            format='\033[90m%(asctime)s\033[0m - %(message)s',
-            datefmt='%H:%M:%S'
-        )
-        
+
+        # Build the system prompt once; tool enablement never changes after
+        # construction, so there is no need to rebuild it per request.
+        self._system_prompt = self._generate_system_prompt()
+
         # Log system prompt once at startup
-        system = self._generate_system_prompt()
         logger.info("\n\033[94m=== SYSTEM PROMPT ===\033[0m")
-        logger.info(system)
+        logger.info(self._system_prompt)
         
     def _log_conversation(self, title: str, content: str, color: str = '\033[0m'):
         """Log conversation with colors and formatting."""
-        logger.info(f"\n{color}=== {title} ===\033[0m\n{content}\n")
+        logger.info("\n%s=== %s ===\033[0m\n%s\n", color, title, content)
     
     def _generate_system_prompt(self) -> str:
         """Generate system prompt based on enabled tools."""
@@ -66,27 +132,22 @@ IMPORTANT RULES:
    - Tool results include both successful outputs and error messages
 7. The timestamp next to each user message [YYYY-MM-DD HH:MM:SS] is always the correct and current date/time when that message was sent. Use this timestamp for any time-related queries or calculations."""
         
-        # Check which tools are enabled
-        enabled_tools = []
-        if self.config['tools']['python']['enabled']:
-            enabled_tools.append(("Python Code Execution", "<python>\n# Your Python code here\n</python>\n<result>Tool output appears here</result>"))
-        if self.config['tools']['terminal']['enabled']:
-            enabled_tools.append(("Terminal Commands", "<terminal>\n# Your command here\n</terminal>\n<result>Tool output appears here</result>"))
-        if self.config['tools']['perplexity']['enabled']:
-            enabled_tools.append(("Perplexity Search", "<perplexity>\n# Your search query here\n</perplexity>\n<result>Tool output appears here</result>"))
-        
+        # Check which tools are enabled against the static doc table
+        enabled = {name for name, cfg in self.config['tools'].items() if cfg.get('enabled')}
+        enabled_tools = [docs for name, docs in _TOOL_DOCS.items() if name in enabled]
+
         # If no tools are enabled, return basic prompt
         if not enabled_tools:
             return base_prompt + "\n\nYou are currently operating in chat-only mode without any external tools enabled."
-        
-        # Add tool documentation
-        prompt = base_prompt + "\n\nYou can execute various tools using XML tags. Available tools and their usage:\n\n"
-        
+
+        # Add tool documentation in a single pass
+        parts = [base_prompt, "\n\nYou can execute various tools using XML tags. Available tools and their usage:\n\n"]
+
         for tool_name, tool_syntax in enabled_tools:
-            prompt += f"{tool_name}:\n{tool_syntax}\n\n"
-        
+            parts.append(f"{tool_name}:\n{tool_syntax}\n\n")
+
         # Add common tags and examples
-        prompt += """Available XML tags:
+        parts.append("""Available XML tags:
 - <thinking>: Express your reasoning process (not visible to user)
 - <answer>: Communicate with the user (ONLY content they see)
 - <task id="task-id">: Marks task start with optional ID
@@ -140,33 +201,33 @@ print(result)
 </python>
 <result>42</result>
 <answer>Great! I've successfully completed the calculation. The result is 42.</answer>
-</endtask>"""
+</endtask>""")
 
-        return prompt
+        return ''.join(parts)
     
     async def get_response(self, message: str, system_prompt: str = None) -> Tuple[str, List[str]]:
         try:
-            messages = []
             debug_logs = []
             chronological_context = []  # Track everything in order
+
+            # Replay prior conversation with validation. The stored entries are
+            # already API-shaped {role, content} dicts and are never mutated in
+            # place, so they can be shared with the local messages list.
+            messages = [
+                ctx for ctx in (*self._sink, *self.current_context)
+                if ctx.get('content') and ctx['content'].strip()
+            ]
             
-            # Add context from previous conversation with validation
-            for ctx in self.current_context:
-                if ctx.get('content') and ctx['content'].strip():
-                    messages.append({
-                        "role": ctx['role'],
-                        "content": ctx['content']
-                    })
-            
-            # Add current user message with timestamp
-            timestamp = datetime.now()
-            message_with_time = f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {message}"
+            # Add current user message with timestamp (formatted exactly once;
+            # strftime is comparatively expensive)
+            ts_str = datetime.now().strftime(_TS_FMT)
+            message_with_time = f"[{ts_str}] {message}"
             
-            # Print the context window header
-            print("\n" + "="*80)
-            print(f"CONTEXT WINDOW:")
-            print("="*80 + "\n")
-            print(f"\033[92mUSER: {message_with_time}\033[0m\n")
+            # Print the context window header (debug only; stdout writes block
+            # the event loop on a slow terminal, so one write and only when
+            # asked for)
+            if self.config.get('debug'):
+                sys.stdout.write(f"{_HEADER}\033[92mUSER: {message_with_time}\033[0m\n\n")
             
             # Add user message to chronological context
             chronological_context.append({"role": "user", "content": message_with_time})
@@ -181,10 +242,17 @@ print(result)
             if task_start and task_start.strip() and task_start != message_with_time:
                 messages.append({"role": "user", "content": task_start})
 
-            # Get system prompt
-            system = self._generate_system_prompt()
+            # System prompt as content blocks: the large static prefix is marked
+            # with cache_control so the API reuses its server-side KV cache
+            # across turns instead of re-processing it; any per-call override
+            # goes in a separate, uncached block.
+            system = [{
+                "type": "text",
+                "text": self._system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
             if system_prompt:
-                system = f"{system}\n\n{system_prompt}"
+                system.append({"type": "text", "text": system_prompt})
 
             processed_response = ""
             buffer = ""
@@ -195,83 +263,110 @@ print(result)
             # Track if we need to regenerate response due to tool results
             needs_regeneration = False
             tool_results = []
+            # Entries already mirrored into the chronological context; the
+            # buffer is re-scanned while a tool is pending, so the same block
+            # can match more than once without this guard.
+            seen_entries = set()
             
             # Get streaming response from Claude
             try:
-                logger.info("Creating message stream...")
-                
                 while True:  # Allow for potential regeneration
-                    message_stream = self.client.messages.create(
+                    buffer = ""
+                    # Accumulate streamed text in a list and join once at the end;
+                    # += on a str per delta is quadratic in response length.
+                    response_parts = []
+                    # Context entries collected during this stream; flushed
+                    # with a single extend once the stream finishes.
+                    stream_entries = []
+
+                    # Stream asynchronously so the event loop (Telegram polling,
+                    # tool timeouts, other sessions) keeps running while tokens
+                    # arrive; every chunk gets its own timeout so a silently
+                    # stalled stream cannot hang the turn forever.
+                    async with self.client.messages.stream(
                         model=self.config['model']['name'],
                         max_tokens=self.config['model']['max_tokens'],
                         system=system,
-                        messages=messages,
-                        stream=True
-                    )
+                        messages=messages
+                    ) as message_stream:
+                        stream_iter = message_stream.__aiter__()
+                        while True:
+                            try:
+                                event = await asyncio.wait_for(
+                                    stream_iter.__anext__(),
+                                    timeout=_STREAM_CHUNK_TIMEOUT
+                                )
+                            except StopAsyncIteration:
+                                break
+                            if hasattr(event, 'type') and event.type == "content_block_delta":
+                                if hasattr(event, 'delta') and hasattr(event.delta, 'text'):
+                                    content = event.delta.text
+                                    if content:
+                                        buffer += content
+                                        response_parts.append(content)
 
-                    logger.info("Starting to process stream...")
-                    buffer = ""
-                    processed_response = ""
-                    
-                    for event in message_stream:
-                        if hasattr(event, 'type') and event.type == "content_block_delta":
-                            if hasattr(event, 'delta') and hasattr(event.delta, 'text'):
-                                content = event.delta.text
-                                if content:
-                                    buffer += content
-                                    processed_response += content
-
-                                    # Process complete tags in buffer
-                                    result = await self.xml_processor.process_stream_buffer(buffer)
+                                        # A tag can only complete when this delta
+                                        # contributes a '>' and an opener is
+                                        # already buffered; plain-text deltas —
+                                        # the overwhelming majority — skip the
+                                        # full buffer scan entirely.
+                                        if '>' not in content or '<' not in buffer:
+                                            continue
+
+                                        # Process complete tags in buffer
+                                        result = await self.xml_processor.process_stream_buffer(buffer)
                                     
-                                    if result.console_output:
-                                        print(result.console_output)
+                                        if result.console_output:
+                                            print(result.console_output)
                                         
-                                        # Handle thinking content
-                                        if "<thinking>" in buffer and "</thinking>" in buffer:
-                                            thinking_match = re.search(r'<thinking>(.*?)</thinking>', buffer, re.DOTALL)
-                                            if thinking_match:
-                                                current_thinking = thinking_match.group(1).strip()
-                                                chronological_context.append({"role": "assistant", "content": f"<thinking>{current_thinking}</thinking>"})
+                                            # Handle thinking content
+                                            if "<thinking>" in buffer and "</thinking>" in buffer:
+                                                thinking_match = _THINKING_RE.search(buffer)
+                                                if thinking_match:
+                                                    current_thinking = thinking_match.group(1).strip()
+                                                    if ('thinking', current_thinking) not in seen_entries:
+                                                        seen_entries.add(('thinking', current_thinking))
+                                                        stream_entries.append({"role": "assistant", "content": f"<thinking>{current_thinking}</thinking>"})
                                         
-                                        # Handle tool calls and results
-                                        for tool in ['python', 'terminal', 'perplexity']:
-                                            if f"<{tool}>" in buffer and f"</{tool}>" in buffer:
-                                                tool_match = re.search(f'<{tool}>(.*?)</{tool}>', buffer, re.DOTALL)
-                                                if tool_match:
-                                                    current_tool_call = tool_match.group(1).strip()
-                                                    chronological_context.append({"role": "assistant", "content": f"<{tool}>{current_tool_call}</{tool}>"})
-                                                    
-                                                    # Process tool results
-                                                    if "<result>" in result.console_output and "</result>" in result.console_output:
-                                                        result_match = re.search(r'<result>(.*?)</result>', result.console_output, re.DOTALL)
-                                                        if result_match:
-                                                            current_tool_result = result_match.group(1).strip()
-                                                            # Store tool result in chronological context
-                                                            chronological_context.append({"role": "assistant", "content": f"<result>{current_tool_result}</result>"})
-                                                            # Add tool result as assistant message for next iteration
-                                                            tool_results.append({
-                                                                "role": "assistant",
-                                                                "content": f"Based on my search, here is what I found:\n{current_tool_result}"
-                                                            })
-                                                            needs_regeneration = True
+                                            # Handle tool calls and results
+                                            for tool, (opener, closer) in _TOOL_TAGS.items():
+                                                open_pos = buffer.find(opener)
+                                                if open_pos != -1 and buffer.find(closer, open_pos) != -1:
+                                                    tool_match = _TOOL_RES[tool].search(buffer, open_pos)
+                                                    if tool_match and (tool, tool_match.group(1)) not in seen_entries:
+                                                        seen_entries.add((tool, tool_match.group(1)))
+                                                        current_tool_call = tool_match.group(1).strip()
+                                                        stream_entries.append({"role": "assistant", "content": f"<{tool}>{current_tool_call}</{tool}>"})
+
+                                                        # Process tool results
+                                                        if "<result>" in result.console_output and "</result>" in result.console_output:
+                                                            result_match = _RESULT_RE.search(result.console_output)
+                                                            if result_match:
+                                                                current_tool_result = result_match.group(1).strip()
+                                                                # Store tool result in chronological context
+                                                                stream_entries.append({"role": "assistant", "content": f"<result>{current_tool_result}</result>"})
+                                                                # Add tool result as assistant message for next iteration
+                                                                tool_results.append({
+                                                                    "role": "assistant",
+                                                                    "content": f"Based on my search, here is what I found:\n{current_tool_result}"
+                                                                })
+                                                                needs_regeneration = True
                                     
-                                    if buffer == result.remaining_buffer:
-                                        continue
+                                        if buffer == result.remaining_buffer:
+                                            continue
                                     
-                                    buffer = result.remaining_buffer
+                                        buffer = result.remaining_buffer
                                     
-                                    if result.task_complete:
-                                        if self.xml_processor.current_task:
-                                            task_id = self.xml_processor.current_task
-                                            self.xml_processor.active_tasks[task_id].update({
-                                                'status': 'completed',
-                                                'end_time': datetime.now()
-                                            })
-                                            self.xml_processor.task_history[task_id] = self.xml_processor.active_tasks[task_id]
-                                            self.xml_processor.current_task = None
-                                        break
+                                        if result.task_complete:
+                                            self.xml_processor.complete_current_task()
+                                            break
                     
+                    # Flush this stream's entries into the chronological
+                    # context in one batch
+                    chronological_context.extend(stream_entries)
+
+                    processed_response = ''.join(response_parts)
+
                     # If we got tool results, add them to messages and regenerate
                     if needs_regeneration and tool_results:
                         messages.extend(tool_results)
@@ -280,7 +375,7 @@ print(result)
                         continue  # Regenerate response with tool results
                     break  # No regeneration needed, exit loop
 
-                logger.info(f"Stream processing complete. Response length: {len(processed_response)}")
+                logger.info("Stream processing complete. Response length: %d", len(processed_response))
                 if not processed_response:
                     processed_response = "<answer>I apologize, but I wasn't able to generate a proper response. Please try again.</answer>"
                 
@@ -291,15 +386,20 @@ print(result)
                 # Add final answer to chronological context
                 chronological_context.append({"role": "assistant", "content": processed_response})
                 
-                # Update the main context with the chronological context
-                self.current_context = chronological_context
+                # Update the main context with the chronological context,
+                # pinning the first exchange as the attention sink
+                if not self._sink:
+                    self._sink = chronological_context[:2]
+                    chronological_context = chronological_context[2:]
+                self.current_context = deque(chronological_context)
+                self._context_bytes = sum(len(ctx['content']) for ctx in chronological_context)
                 
                 return processed_response, []
                 
             except Exception as e:
-                logger.error(f"Streaming error: {str(e)}")
+                logger.error("Streaming error: %s", e)
                 if "invalid_request_error" in str(e):
-                    logger.error(f"Message payload: {messages}")
+                    logger.error("Message payload: %s", messages)
                 raise
             
         except Exception as e:
@@ -307,34 +407,56 @@ print(result)
             logger.exception("Full exception details:")
             return f"<answer>I encountered an error: {str(e)}</answer>", []
     
+    def _append_context(self, entry: Dict[str, str]):
+        """Append one entry, filling the pinned sink before the evictable tail."""
+        if len(self._sink) < 2:
+            self._sink.append(entry)
+        else:
+            self.current_context.append(entry)
+            self._context_bytes += len(entry['content'])
+
     def update_context(self, message: str, response: str):
         """Update conversation context with new message and response."""
         # Add user message to context if not empty
         if message and message.strip():
-            self.current_context.append({
+            self._append_context({
                 "role": "user",
                 "content": message
             })
-        
+
         # Add assistant response to context if not empty
         if response and response.strip():
-            self.current_context.append({
+            self._append_context({
                 "role": "assistant",
                 "content": response
             })
-        
-        # Trim context if it gets too long while keeping at least the last exchange
-        while len(str(self.current_context)) > self.max_context_length and len(self.current_context) > 2:
-            self.current_context.pop(0)
-            self.current_context.pop(0)  # Remove in pairs to keep context coherent
+
+        # Trim context if it gets too long while keeping at least the last
+        # exchange. The running byte count makes each trim O(1) instead of
+        # re-serializing the whole list per iteration.
+        while self._context_bytes > self.max_context_length and len(self.current_context) > 2:
+            old = self.current_context.popleft()
+            self._context_bytes -= len(old['content'])
+            old = self.current_context.popleft()  # Remove in pairs to keep context coherent
+            self._context_bytes -= len(old['content'])
     
+    async def close(self):
+        """Release pooled HTTP connections on shutdown."""
+        for executor in self.xml_processor.executors.values():
+            closer = getattr(executor, 'close', None)
+            if closer is not None:
+                await closer()
+        await self._http.aclose()
+
     def clear_context(self):
         """Clear the conversation context."""
-        self.current_context = []
-    
+        self.current_context = deque()
+        self._context_bytes = 0
+        self._sink = []
+
     def get_current_context(self) -> List[Dict[str, str]]:
-        """Get the current conversation context."""
-        return self.current_context.copy()
+        """Get the current conversation context, sink entries first."""
+        return [*self._sink, *self.current_context]
     
     def get_active_tasks(self) -> Dict[str, Dict]:
         """Get information about currently active tasks."""
@@ -1,93 +1,148 @@
 import os
-import json
 import logging
-import fcntl
+import aiosqlite
 from datetime import datetime
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Schema: memories indexed by timestamp, with a side table for tags so tag
+# filters hit an index instead of decoding every stored entry.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS memory_tags (
+    memory_id INTEGER NOT NULL REFERENCES memories(id),
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_ts ON memories(ts);
+CREATE INDEX IF NOT EXISTS idx_memory_tags_tag ON memory_tags(tag);
+"""
+
+# Separator used when aggregating tags back out of the side table; never
+# appears in sensible tag names.
+_TAG_SEP = '\x1f'
+
+
 class MemoryManager:
-    def __init__(self, memory_file: str = "memory/long_term.txt"):
-        self.memory_file = memory_file
-        self._ensure_memory_file_exists()
-    
-    def _ensure_memory_file_exists(self):
-        """Ensure the memory file and directory exist."""
-        os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
-        if not os.path.exists(self.memory_file):
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                f.write('')
-    
+    def __init__(self, db_file: str = "memory/long_term.db"):
+        self.db_file = db_file
+        self._ensure_db_dir_exists()
+        self._schema_ready = False
+
+    def _ensure_db_dir_exists(self):
+        """Ensure the directory holding the database exists."""
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open a connection with WAL enabled and the schema in place.
+
+        WAL mode lets readers proceed while a writer is active, replacing the
+        fcntl file locking the old JSONL store needed.
+        """
+        db = await aiosqlite.connect(self.db_file)
+        await db.execute('PRAGMA journal_mode=WAL')
+        if not self._schema_ready:
+            await db.executescript(_SCHEMA)
+            await db.commit()
+            self._schema_ready = True
+        return db
+
     async def store_memory(self, content: str, tags: List[str] = None) -> bool:
         """Store a new memory entry with timestamp."""
         try:
-            entry = {
-                'timestamp': datetime.now().isoformat(),
-                'content': content,
-                'tags': tags or []
-            }
-            
-            with open(self.memory_file, 'a', encoding='utf-8') as f:
-                # Get an exclusive lock
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    f.write(json.dumps(entry) + '\n')
-                finally:
-                    # Release the lock
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            db = await self._connect()
+            try:
+                cursor = await db.execute(
+                    "INSERT INTO memories (ts, content) VALUES (?, ?)",
+                    (datetime.now().isoformat(), content)
+                )
+                if tags:
+                    await db.executemany(
+                        "INSERT INTO memory_tags (memory_id, tag) VALUES (?, ?)",
+                        [(cursor.lastrowid, tag) for tag in tags]
+                    )
+                await db.commit()
+            finally:
+                await db.close()
             return True
         except Exception as e:
             logger.error(f"Error storing memory: {e}")
             return False
-    
-    async def retrieve_memories(self, 
-                              tags: List[str] = None, 
-                              limit: int = 10, 
+
+    async def retrieve_memories(self,
+                              tags: List[str] = None,
+                              limit: int = 10,
                               since: datetime = None) -> List[Dict]:
-        """Retrieve memories, optionally filtered by tags and time."""
-        memories = []
+        """Retrieve memories, optionally filtered by tags and time.
+
+        Filtering and the limit run inside SQLite against the timestamp and
+        tag indexes, so the cost scales with the result size rather than the
+        total number of stored memories.
+        """
+        query = [
+            "SELECT m.ts, m.content,"
+            f" COALESCE(group_concat(t.tag, '{_TAG_SEP}'), '')",
+            "FROM memories m",
+            "LEFT JOIN memory_tags t ON t.memory_id = m.id"
+        ]
+        where = []
+        params = []
+
+        if since:
+            where.append("m.ts >= ?")
+            params.append(since.isoformat())
+
+        if tags:
+            # Entry must carry every requested tag
+            placeholders = ', '.join('?' for _ in tags)
+            where.append(
+                "m.id IN (SELECT memory_id FROM memory_tags"
+                f" WHERE tag IN ({placeholders})"
+                " GROUP BY memory_id HAVING COUNT(DISTINCT tag) = ?)"
+            )
+            params.extend(tags)
+            params.append(len(tags))
+
+        if where:
+            query.append("WHERE " + " AND ".join(where))
+        query.append("GROUP BY m.id ORDER BY m.ts DESC LIMIT ?")
+        params.append(limit)
+
         try:
-            with open(self.memory_file, 'r', encoding='utf-8') as f:
-                # Get a shared lock for reading
-                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                try:
-                    for line in f:
-                        if line.strip():
-                            memory = json.loads(line)
-                            
-                            # Apply filters
-                            if since and datetime.fromisoformat(memory['timestamp']) < since:
-                                continue
-                                
-                            if tags and not all(tag in memory['tags'] for tag in tags):
-                                continue
-                            
-                            memories.append(memory)
-                            
-                            if len(memories) >= limit:
-                                break
-                finally:
-                    # Release the lock
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                    
-            return memories
+            db = await self._connect()
+            try:
+                async with db.execute('\n'.join(query), params) as cursor:
+                    rows = await cursor.fetchall()
+            finally:
+                await db.close()
+
+            return [
+                {
+                    'timestamp': ts,
+                    'content': content,
+                    'tags': tag_blob.split(_TAG_SEP) if tag_blob else []
+                }
+                for ts, content, tag_blob in rows
+            ]
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}")
             return []
-    
+
     async def clear_memories(self) -> bool:
         """Clear all stored memories."""
         try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                # Get an exclusive lock
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    f.write('')
-                finally:
-                    # Release the lock
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            db = await self._connect()
+            try:
+                await db.execute("DELETE FROM memory_tags")
+                await db.execute("DELETE FROM memories")
+                await db.commit()
+            finally:
+                await db.close()
             return True
         except Exception as e:
             logger.error(f"Error clearing memories: {e}")
-            return False 
\ No newline at end of file
+            return False
@@ -1,16 +1,49 @@
 import logging
 import re
-import json
 import asyncio
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import import_module
+from types import MappingProxyType
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
-from tools.executor.python_runtime import PythonExecutor
-from tools.executor.terminal import TerminalExecutor
-from tools.web.perplexity import PerplexityExecutor
 from dataclasses import dataclass
+from ..config import load_config
 
 logger = logging.getLogger(__name__)
 
+# Completed tasks kept for /tasks; older entries are evicted so a
+# long-running bot does not accumulate history without bound
+_TASK_HISTORY_LIMIT = 256
+
+# ANSI color codes for the streaming console output; bound once here so the
+# per-token hot path appends constants instead of building f-strings
+_BLUE = '\033[94m'
+_GREEN = '\033[92m'
+_YELLOW = '\033[93m'
+_RESET = '\033[0m'
+
+
+def compile_tag_pattern(tag: str) -> re.Pattern:
+    """Compile a pattern for <tag>...</tag> that cannot backtrack badly.
+
+    The naive lazy '<tag>(.*?)</tag>' degrades to O(n^2) when the closer never
+    arrives (output truncated at max_tokens or still streaming). This shape
+    consumes non-'<' runs greedily and only steps over '<' when it does not
+    start the closer, so matching always makes forward progress.
+    """
+    return re.compile(
+        f'<{tag}>(?P<content>[^<]*(?:<(?!/{tag}>)[^<]*)*)</{tag}>',
+        re.DOTALL
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    """Shared compiled-pattern pool; every processor instance hits one cache."""
+    return re.compile(pattern, re.DOTALL)
+
+
 @dataclass
 class StreamResult:
     remaining_buffer: str
@@ -21,50 +54,79 @@ class XMLProcessor:
     """Processes XML tags in Claude's responses and executes corresponding tools."""
     
     def __init__(self):
-        # Load config
-        with open('config/config.json', 'r') as f:
-            self.config = json.load(f)['system']['tools']
+        # Load config (shared cached parse; no disk I/O after the first load)
+        self.config = load_config()['tools']
         
-        # Initialize tool executors
+        # Initialize tool executors from one table; adding a tool is a
+        # single entry here instead of another copied if-block. Executor
+        # modules are imported only when their tool is enabled, so disabled
+        # tools (and their dependencies, e.g. httpx for perplexity) never
+        # cost import time.
         self.executors = {}
-        if self.config['python']['enabled']:
-            self.executors['python'] = PythonExecutor()
-            self.executors['python'].timeout = self.config['python']['max_execution_time']
-            
-        if self.config['terminal']['enabled']:
-            self.executors['terminal'] = TerminalExecutor()
-            self.executors['terminal'].timeout = self.config['terminal']['max_execution_time']
-            
-        if self.config['perplexity']['enabled']:
-            self.executors['perplexity'] = PerplexityExecutor()
-            self.executors['perplexity'].timeout = self.config['perplexity']['max_execution_time']
+        for name, module_path, class_name in (
+            ('python', 'tools.executor.python_runtime', 'PythonExecutor'),
+            ('terminal', 'tools.executor.terminal', 'TerminalExecutor'),
+            ('perplexity', 'tools.web.perplexity', 'PerplexityExecutor'),
+        ):
+            if self.config[name]['enabled']:
+                executor = getattr(import_module(module_path), class_name)()
+                executor.timeout = self.config[name]['max_execution_time']
+                self.executors[name] = executor
+
+        # Flat timeout map bound once so the hot dispatch path does a single
+        # lookup instead of three nested ones per tool call
+        self._timeouts = {
+            name: cfg['max_execution_time'] for name, cfg in self.config.items()
+        }
         
         # Define XML tag patterns with named groups for better performance
         self.tag_patterns = {
-            'task': re.compile(r'<task(?:\s+id="(?P<id>[^"]*)")?\s*>(?P<content>.*?)</task>', re.DOTALL),
-            'thinking': re.compile(r'<thinking>(?P<content>.*?)</thinking>', re.DOTALL),
-            'answer': re.compile(r'<answer>(?P<content>.*?)</answer>', re.DOTALL),
-            'python': re.compile(r'<python>(?P<content>.*?)</python>', re.DOTALL),
-            'terminal': re.compile(r'<terminal>(?P<content>.*?)</terminal>', re.DOTALL),
-            'perplexity': re.compile(r'<perplexity>(?P<content>.*?)</perplexity>', re.DOTALL),
-            'endtask': re.compile(r'</endtask>', re.DOTALL)
+            'task': re.compile(r'<task(?:\s+id="(?P<id>[^"]*)")?\s*>(?P<content>[^<]*(?:<(?!/task>)[^<]*)*)</task>', re.DOTALL),
+            'thinking': compile_tag_pattern('thinking'),
+            'answer': compile_tag_pattern('answer'),
+            'python': compile_tag_pattern('python'),
+            'terminal': compile_tag_pattern('terminal'),
+            'perplexity': compile_tag_pattern('perplexity'),
         }
+
+        # Single alternation covering every tag process_response cares about,
+        # so one finditer pass replaces a separate linear scan per pattern.
+        # Content uses the same forward-progress shape as compile_tag_pattern.
+        self._combined = re.compile(
+            r'<(?P<kind>task|thinking|answer|python|terminal|perplexity)'
+            r'(?:\s+id="(?P<id>[^"]*)")?\s*>'
+            r'(?P<content>[^<]*(?:<(?!/(?P=kind)>)[^<]*)*)'
+            r'</(?P=kind)>',
+            re.DOTALL
+        )
         
+        # Anchored matcher for process_tool_execution, compiled once instead
+        # of on every tool call; the optional id group covers task tags.
+        self._tool_match = re.compile(
+            r'<(?P<kind>python|terminal|perplexity|answer|task)'
+            r'(?:\s+id="(?P<id>[^"]*)")?\s*>'
+            r'(?P<content>[^<]*(?:<(?!/(?P=kind)>)[^<]*)*)'
+            r'</(?P=kind)>',
+            re.DOTALL
+        )
+
         # Track active tasks
         self.active_tasks = {}
         
-        # Cache for compiled regex patterns
-        self._regex_cache = {}
-        
-        self.task_history = {}
+        # Bounded, insertion-ordered record of completed tasks
+        self.task_history = OrderedDict()
+        # Monotonic counter for generated task ids; cheaper than sizing
+        # task_history on every new task.
+        self.task_count = 0
         self.telegram_handler = None  # Will be set by TelegramBot
         self.current_task = None
+        # How far into the stream buffer we have already looked for the
+        # </endtask> sentinel; lets each call scan only the new tail.
+        self._endtask_scan_pos = 0
     
     def _get_regex(self, pattern: str) -> re.Pattern:
-        """Get or compile a regex pattern."""
-        if pattern not in self._regex_cache:
-            self._regex_cache[pattern] = re.compile(pattern, re.DOTALL)
-        return self._regex_cache[pattern]
+        """Get or compile a regex pattern (backed by the module-level pool)."""
+        return _compile(pattern)
     
     async def process_response(self, response: str) -> Tuple[str, List[str]]:
         """Process a response from Claude, executing tools and collecting memory entries."""
@@ -73,44 +135,60 @@ class XMLProcessor:
         current_pos = 0
         
         try:
-            # First, process task tags to track task context
-            for match in self.tag_patterns['task'].finditer(response):
-                task_id = match.group('id') or f"task-{len(self.active_tasks)}"
-                self.active_tasks[task_id] = {
-                    'start_time': datetime.now(),
-                    'status': 'running'
-                }
-            
-            # Process tool tags and inject results
-            for tool_name in ['python', 'terminal', 'perplexity']:
-                if tool_name not in self.executors:
+            # Chat-only replies with no task context need no regex work at
+            # all; a C-level containment check is far cheaper than a scan.
+            if not any(t in response for t in ('<task', '<python>', '<terminal>', '<perplexity>')):
+                return processed_response, memory_entries
+
+            # First pass: track tasks and collect tool calls with their spans.
+            # Independent tool blocks have no ordering dependency, so they are
+            # executed concurrently and the results spliced in afterwards.
+            spans = []
+            tasks = []
+            for match in self._combined.finditer(response):
+                kind = match.group('kind')
+
+                if kind == 'task':
+                    task_id = match.group('id')
+                    if not task_id:
+                        self.task_count += 1
+                        task_id = f"task-{self.task_count}"
+                    self.active_tasks[task_id] = {
+                        'start_time': datetime.now(),
+                        'status': 'running'
+                    }
                     continue
-                    
-                for match in self.tag_patterns[tool_name].finditer(processed_response):
-                    content = match.group('content').strip()
-                    start, end = match.span()
-                    
-                    try:
-                        result = await self.executors[tool_name].execute(content)
-                        # Inject result directly after the tool closing tag
-                        processed_response = (
-                            processed_response[:end] + 
-                            f"\n<result>{result}</result>\n" + 
-                            processed_response[end:]
-                        )
-                    except asyncio.TimeoutError:
-                        processed_response = (
-                            processed_response[:end] + 
-                            f"\n<result>Tool execution timed out after {self.executors[tool_name].timeout} seconds</result>\n" + 
-                            processed_response[end:]
-                        )
-                    except Exception as e:
-                        processed_response = (
-                            processed_response[:end] + 
-                            f"\n<result>Tool execution failed: {str(e)}</result>\n" + 
-                            processed_response[end:]
-                        )
-            
+
+                if kind not in self.executors:
+                    continue
+
+                # Route through process_tool_execution so both the batch and
+                # streaming paths share one timeout/error-handling
+                # implementation.
+                spans.append((match.end(), kind))
+                tasks.append(asyncio.ensure_future(self.process_tool_execution(match.group(0))))
+
+            results = await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
+
+            # Second pass: assemble the output as a segment list with one
+            # final join, so each injection costs O(len(result)) rather than
+            # a full copy of the response.
+            parts = []
+            prev_end = 0
+            for (end, kind), result in zip(spans, results):
+                if isinstance(result, Exception):
+                    injection = f"\n<result>Tool execution failed: {str(result)}</result>\n"
+                else:
+                    injection = f"\n<result>{result}</result>\n"
+
+                # Inject result directly after the tool closing tag
+                parts.append(response[prev_end:end])
+                parts.append(injection)
+                prev_end = end
+
+            parts.append(response[prev_end:])
+            processed_response = ''.join(parts)
+
             return processed_response, memory_entries
             
         except Exception as e:
@@ -120,24 +198,58 @@ class XMLProcessor:
     def extract_final_answer(self, response: str) -> Optional[str]:
         """Extract the final answer from the response."""
         try:
-            match = self.tag_patterns['answer'].search(response)
-            return match.group('content').strip() if match else response.strip()
+            # Fixed-literal probes beat the regex engine here: most responses
+            # either lack the tag entirely or contain exactly one block
+            start = response.find('<answer>')
+            if start == -1:
+                return response.strip()
+            end = response.find('</answer>', start + len('<answer>'))
+            if end == -1:
+                return response.strip()
+            return response[start + len('<answer>'):end].strip()
         except Exception as e:
             logger.error(f"Error extracting final answer: {e}")
             return None
     
     def get_active_tasks(self) -> Dict[str, Dict]:
-        """Return information about currently active tasks."""
-        return {
-            task_id: task_info 
-            for task_id, task_info in self.active_tasks.items() 
-            if task_info['status'] == 'running'
-        }
+        """Return information about currently active tasks.
+
+        Completed tasks move to task_history on endtask, so active_tasks
+        only ever holds running entries — no status filter needed.
+        """
+        return dict(self.active_tasks)
     
     def get_task_history(self) -> Dict[str, Dict]:
-        """Return information about all tasks, including completed ones."""
-        return self.active_tasks.copy()
+        """Return a read-only view of completed tasks, oldest first.
+
+        O(1) — returns a live view rather than copying; callers that need a
+        snapshot should copy explicitly. The history is bounded at
+        _TASK_HISTORY_LIMIT entries.
+        """
+        return MappingProxyType(self.task_history)
     
+    def complete_current_task(self):
+        """Move the current task out of active_tasks into the history.
+
+        Single transition point for task completion — both the batch endtask
+        branch and the streaming path in LLMContext go through here, so the
+        running/completed split behind get_active_tasks stays true.
+        """
+        task_id = self.current_task
+        if not task_id:
+            return
+        task_info = self.active_tasks.pop(task_id, None)
+        if task_info is not None:
+            task_info.update({
+                'status': 'completed',
+                'end_time': datetime.now()
+            })
+            self.task_history[task_id] = task_info
+            self.task_history.move_to_end(task_id)
+            if len(self.task_history) > _TASK_HISTORY_LIMIT:
+                self.task_history.popitem(last=False)
+        self.current_task = None
+
     def set_telegram_handler(self, handler):
         """Set the telegram handler for sending answers."""
         self.telegram_handler = handler
@@ -145,20 +257,27 @@ class XMLProcessor:
     async def process_tool_execution(self, content: str) -> str:
         """Process tool execution tags and return the result."""
         try:
-            # Extract tag type and content
-            tag_match = re.match(r'<(python|terminal|perplexity|answer|task)>(.*?)</\1>', content, re.DOTALL)
+            # Handle endtask before regex work: a plain substring check is the
+            # cheapest test and the closer never matches the tag pattern anyway
+            if '</endtask>' in content:
+                self.complete_current_task()
+                return "Task completed"
+
+            # Extract tag type and content with the precompiled matcher
+            tag_match = self._tool_match.match(content)
             if not tag_match:
                 return "Invalid tag format"
-                
-            tag_type = tag_match.group(1)
-            tag_content = tag_match.group(2).strip()
-            
+
+            tag_type = tag_match.group('kind')
+            tag_content = tag_match.group('content').strip()
+
             # Handle task tags
             if tag_type == 'task':
-                # Extract task ID if present
-                task_id_match = re.search(r'id="([^"]*)"', content)
-                task_id = task_id_match.group(1) if task_id_match else f"task-{len(self.task_history) + 1}"
-                
+                task_id = tag_match.group('id')
+                if not task_id:
+                    self.task_count += 1
+                    task_id = f"task-{self.task_count}"
+
                 # Only create new task if we're not in one
                 if not self.current_task:
                     self.current_task = task_id
@@ -167,37 +286,26 @@ class XMLProcessor:
                         'status': 'running'
                     }
                 return f"Started task {task_id}"
-            
-            # Handle endtask
-            if '</endtask>' in content:
-                if self.current_task:
-                    task_id = self.current_task
-                    self.active_tasks[task_id].update({
-                        'status': 'completed',
-                        'end_time': datetime.now()
-                    })
-                    self.task_history[task_id] = self.active_tasks[task_id]
-                    self.current_task = None
-                return "Task completed"
-            
+
             # Handle answer tags
             if tag_type == 'answer':
                 if self.telegram_handler:
                     await self.telegram_handler.send_answer(tag_content)
                 return tag_content
             
-            # Handle tool tags
-            if tag_type in self.executors:
+            # Handle tool tags via direct executor lookup
+            executor = self.executors.get(tag_type)
+            if executor is not None:
                 try:
                     return await asyncio.wait_for(
-                        self.executors[tag_type].execute(tag_content),
-                        timeout=self.config[tag_type]['max_execution_time']
+                        executor.execute(tag_content),
+                        timeout=self._timeouts[tag_type]
                     )
                 except asyncio.TimeoutError:
-                    return f"Tool execution timed out after {self.config[tag_type]['max_execution_time']} seconds"
+                    return f"Tool execution timed out after {self._timeouts[tag_type]} seconds"
                 except Exception as e:
                     return f"Tool execution failed: {str(e)}"
-            
+
             return f"Unhandled tag type: {tag_type}"
             
         except Exception as e:
@@ -206,7 +314,8 @@ class XMLProcessor:
 
     async def start_task(self, message: str) -> str:
         """Create a new task with the given message."""
-        task_id = f"task-{len(self.task_history) + 1}"
+        self.task_count += 1
+        task_id = f"task-{self.task_count}"
         self.current_task = task_id
         self.active_tasks[task_id] = {
             'start_time': datetime.now(),
@@ -216,26 +325,38 @@ class XMLProcessor:
 
     async def process_stream_buffer(self, buffer: str) -> StreamResult:
         """Process the streaming buffer and handle any complete tags."""
+        # Plain prose between tags is the common case while tokens stream in;
+        # without a '<' no pattern can match, so skip all regex work
+        if '<' not in buffer:
+            return StreamResult(
+                remaining_buffer=buffer,
+                console_output="",
+                task_complete=False
+            )
+
         console_output = []
-        remaining = buffer
+        pos = 0  # Start of the unconsumed portion of the buffer
         task_complete = False
         should_pause = False
         tool_execution_complete = True  # Track if tool execution is complete
 
-        # Look for complete tags
+        # Look for complete tags. Searching with a start position walks the
+        # original buffer in place instead of allocating a tail slice per tag.
         for tag_name, pattern in self.tag_patterns.items():
-            match = pattern.search(remaining)
-            if match and tag_name != 'endtask':  # Skip processing endtask tags
+            match = pattern.search(buffer, pos)
+            if match:
                 # Extract the complete tag
                 start, end = match.span()
-                tag_content = remaining[start:end]
+                tag_content = buffer[start:end]
                 
                 # Process the tag
+                # Entries are joined with newlines, so each colored block is
+                # one element: constant + content + constant, no format call
                 if tag_name == 'thinking':
-                    console_output.append(f"\033[94m{tag_content}\033[0m")
+                    console_output.append(_BLUE + tag_content + _RESET)
                 elif tag_name == 'answer':
                     result = await self.process_tool_execution(tag_content)
-                    console_output.append(f"\033[92m{tag_content}\033[0m")
+                    console_output.append(_GREEN + tag_content + _RESET)
                 elif tag_name in ['python', 'terminal', 'perplexity']:
                     # Signal that we need to pause token generation
                     should_pause = True
@@ -243,32 +364,37 @@ class XMLProcessor:
                     result = await self.process_tool_execution(tag_content)
                     
                     # Start yellow color block
-                    console_output.append("\033[93m")
+                    console_output.append(_YELLOW)
                     # Add the tool call
                     console_output.append(tag_content)
                     
-                    # Add the result if any and verify injection
+                    # Add the result if any
                     if result:
-                        result_tag = f"<result>{result}</result>"
-                        console_output.append(result_tag)
-                        # Verify result is properly injected before continuing
-                        if result_tag in console_output[-1]:
-                            tool_execution_complete = True
+                        console_output.append(f"<result>{result}</result>")
+                        tool_execution_complete = True
                     
                     # End yellow color block
-                    console_output.append("\033[0m")
+                    console_output.append(_RESET)
                 
-                # Only remove processed tag from buffer if tool execution is complete
+                # Only consume the processed tag if tool execution is complete
                 if tool_execution_complete:
-                    remaining = remaining[end:]
+                    pos = end
 
-        # Check if the AI generated an endtask tag (but don't process it)
-        if '</endtask>' in buffer:
+        # Check if the AI generated an endtask tag (but don't process it).
+        # The buffer only grows at the tail between truncations, so resume the
+        # scan where the previous call left off; a shorter buffer means the
+        # stream restarted and the position must reset.
+        if self._endtask_scan_pos > len(buffer):
+            self._endtask_scan_pos = 0
+        if buffer.find('</endtask>', self._endtask_scan_pos) != -1:
             task_complete = True
             console_output.append("="*80)
 
+        returned_buffer = buffer[pos:] if tool_execution_complete else buffer  # Return full buffer if tool execution isn't complete
+        self._endtask_scan_pos = max(0, len(returned_buffer) - len('</endtask>') + 1)
+
         return StreamResult(
-            remaining_buffer=remaining if tool_execution_complete else buffer,  # Return full buffer if tool execution isn't complete
+            remaining_buffer=returned_buffer,
             console_output="\n".join(console_output),
             task_complete=task_complete
         )
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """Load and cache the system config (decoded once per process).
+
+    The config is static for the process lifetime, so every component shares
+    one parsed dict instead of re-reading the file per construction. The path
+    can be overridden with the GLAD_CONFIG_PATH environment variable.
+    """
+    config_path = os.getenv('GLAD_CONFIG_PATH', 'config/config.json')
+    return orjson.loads(Path(config_path).read_bytes())['system']
@@ -1,8 +1,10 @@
+import asyncio
 import logging
-import json
 from ..ai.context import LLMContext
 from ..ai.memory import MemoryManager
+from ..config import load_config
 from datetime import datetime
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +13,20 @@ class ConsoleHandler:
         self.llm_context = llm_context
         self.memory_manager = memory_manager
         
-        # Load system config for tool status
-        with open('config/config.json', 'r') as f:
-            self.system_config = json.load(f)['system']
+        # Load system config for tool status (shared cached parse)
+        self.system_config = load_config()
         
         # Register with XML processor for answer handling
         self.llm_context.xml_processor.set_telegram_handler(self)  # We'll reuse telegram handler for consistency
+
+        # Command dispatch table; a handler returning False stops the loop
+        self._commands = {
+            'help': self.show_help,
+            'status': self.show_status,
+            'clear': self.clear_context,
+            'tasks': self.show_tasks,
+            'exit': lambda: False,
+        }
     
     def show_help(self):
         """Show available commands and features."""
@@ -68,8 +78,8 @@ class ConsoleHandler:
         """Show task status."""
         active_tasks = self.llm_context.get_active_tasks()
         task_history = self.llm_context.get_task_history()
-        
-        if not task_history:
+
+        if not active_tasks and not task_history:
             print("No tasks have been executed yet.")
             return
         
@@ -78,24 +88,26 @@ class ConsoleHandler:
         # Show active tasks first
         if active_tasks:
             for task_id, task_info in active_tasks.items():
-                start_time = task_info['start_time']
-                elapsed = (datetime.now() - datetime.fromisoformat(str(start_time))).total_seconds()
+                # start_time is stored as a datetime; no ISO round-trip needed
+                elapsed = (datetime.now() - task_info['start_time']).total_seconds()
                 print(f"• {task_id} (running for {int(elapsed)}s)")
         else:
             print("No active tasks")
         
         print("\n✅ Recently Completed Tasks:\n")
-        completed_tasks = {
-            task_id: info for task_id, info in task_history.items()
-            if info['status'] == 'completed'
-        }
-        
-        if completed_tasks:
-            for task_id, task_info in list(completed_tasks.items())[-5:]:  # Show last 5
+        # Walk the bounded history newest-first and stop after five entries
+        # instead of materializing a filtered copy
+        recent_completed = list(islice(
+            (item for item in reversed(task_history.items())
+             if item[1]['status'] == 'completed'),
+            5
+        ))
+
+        if recent_completed:
+            for task_id, task_info in recent_completed:
                 start_time = task_info['start_time']
                 end_time = task_info.get('end_time', datetime.now())
-                duration = (datetime.fromisoformat(str(end_time)) - 
-                          datetime.fromisoformat(str(start_time))).total_seconds()
+                duration = (end_time - start_time).total_seconds()
                 print(f"• {task_id} (completed in {int(duration)}s)")
         else:
             print("No completed tasks")
@@ -114,34 +126,28 @@ class ConsoleHandler:
         """Handle user input."""
         try:
             if message.startswith('/'):
-                command = message[1:].lower()
-                if command == 'help':
-                    self.show_help()
-                elif command == 'status':
-                    self.show_status()
-                elif command == 'clear':
-                    self.clear_context()
-                elif command == 'tasks':
-                    self.show_tasks()
-                elif command == 'exit':
-                    return False
-                else:
+                parts = message[1:].split(None, 1)
+                handler = self._commands.get(parts[0].lower()) if parts else None
+                if handler is None:
                     print("Unknown command. Type /help to see available commands.")
+                    return True
+                result = handler()
+                return result if result is not None else True
             else:
                 # Get response from Claude
                 response, memory_entries = await self.llm_context.get_response(message)
                 
-                # Store memory entries if any
-                for entry in memory_entries:
-                    await self.memory_manager.store_memory(
+                # Store memory entries and the user message concurrently;
+                # the writes are independent, so pay one round of I/O latency
+                await asyncio.gather(
+                    *(self.memory_manager.store_memory(
                         content=entry,
                         tags=['conversation_memory']
+                    ) for entry in memory_entries),
+                    self.memory_manager.store_memory(
+                        content=message,
+                        tags=['user_message']
                     )
-                
-                # Store user message in memory
-                await self.memory_manager.store_memory(
-                    content=message,
-                    tags=['user_message']
                 )
                 
                 # Update context with processed response
@@ -158,6 +164,11 @@ class ConsoleHandler:
     async def start(self):
         """Start the console interface."""
         try:
+            # Eager tasks (3.12+) run new coroutines synchronously until their
+            # first suspension, skipping an event-loop pass per task
+            if hasattr(asyncio, 'eager_task_factory'):
+                asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
             print("\n👋 Welcome to GLAD Console Interface!")
             print("Type /help to see available commands or just start chatting.\n")
             
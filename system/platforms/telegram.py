@@ -5,7 +5,9 @@ from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
 from ..ai.context import LLMContext
 from ..ai.memory import MemoryManager
+from ..config import load_config
 from datetime import datetime
+from itertools import islice
 import re
 from typing import Tuple
 import asyncio
@@ -19,14 +21,16 @@ class TelegramBot:
         self.llm_context = llm_context
         self.memory_manager = memory_manager
         self.current_message = None
-        
+        # Serializes chunked replies so Telegram's per-chat rate limit is
+        # respected while the sends still overlap their serialization work
+        self._tg_sem = asyncio.Semaphore(1)
+
         # Load platform config
         with open('config/platforms.json', 'r') as f:
             self.config = json.load(f)['telegram']
         
-        # Load system config for tool status
-        with open('config/config.json', 'r') as f:
-            self.system_config = json.load(f)['system']
+        # Load system config for tool status (shared cached parse)
+        self.system_config = load_config()
         
         # Register with XML processor for answer handling
         self.llm_context.xml_processor.set_telegram_handler(self)
@@ -111,8 +115,8 @@ class TelegramBot:
         """Handle /tasks command to show task status."""
         active_tasks = self.llm_context.get_active_tasks()
         task_history = self.llm_context.get_task_history()
-        
-        if not task_history:
+
+        if not active_tasks and not task_history:
             await message.reply("No tasks have been executed yet.")
             return
         
@@ -121,25 +125,27 @@ class TelegramBot:
         # Show active tasks first
         if active_tasks:
             for task_id, task_info in active_tasks.items():
-                start_time = task_info['start_time']
-                elapsed = (datetime.now() - datetime.fromisoformat(str(start_time))).total_seconds()
+                # start_time is stored as a datetime; no ISO round-trip needed
+                elapsed = (datetime.now() - task_info['start_time']).total_seconds()
                 task_text += f"• {task_id} (running for {int(elapsed)}s)\n"
         else:
             task_text += "No active tasks\n"
         
         # Show recently completed tasks
         task_text += "\n✅ Recently Completed Tasks:\n\n"
-        completed_tasks = {
-            task_id: info for task_id, info in task_history.items()
-            if info['status'] == 'completed'
-        }
-        
-        if completed_tasks:
-            for task_id, task_info in list(completed_tasks.items())[-5:]:  # Show last 5
+        # Walk the bounded history newest-first and stop after five entries
+        # instead of materializing a filtered copy
+        recent_completed = list(islice(
+            (item for item in reversed(task_history.items())
+             if item[1]['status'] == 'completed'),
+            5
+        ))
+
+        if recent_completed:
+            for task_id, task_info in recent_completed:
                 start_time = task_info['start_time']
                 end_time = task_info.get('end_time', datetime.now())
-                duration = (datetime.fromisoformat(str(end_time)) - 
-                          datetime.fromisoformat(str(start_time))).total_seconds()
+                duration = (end_time - start_time).total_seconds()
                 task_text += f"• {task_id} (completed in {int(duration)}s)\n"
         else:
             task_text += "No completed tasks\n"
@@ -158,11 +164,18 @@ class TelegramBot:
     
     async def _send_message_chunks(self, message: types.Message, text: str) -> None:
         """Send a message in chunks if it's too long."""
-        if len(text) > self.config['max_message_length']:
-            chunks = [text[i:i + self.config['max_message_length']]
-                     for i in range(0, len(text), self.config['max_message_length'])]
-            for chunk in chunks:
-                await message.reply(chunk)
+        max_len = self.config['max_message_length']
+        if len(text) > max_len:
+            chunks = [text[i:i + max_len] for i in range(0, len(text), max_len)]
+
+            # Dispatch all chunks at once; the semaphore keeps them in order
+            # and within Telegram's per-chat rate limit, while request
+            # serialization overlaps instead of paying a full RTT per chunk
+            async def _reply(chunk: str):
+                async with self._tg_sem:
+                    return await message.reply(chunk)
+
+            await asyncio.gather(*(_reply(chunk) for chunk in chunks))
         else:
             await message.reply(text)
     
@@ -175,17 +188,17 @@ class TelegramBot:
             # Get response from Claude
             response, memory_entries = await self.llm_context.get_response(message.text)
             
-            # Store memory entries if any
-            for entry in memory_entries:
-                await self.memory_manager.store_memory(
+            # Store memory entries and the user message concurrently;
+            # the writes are independent, so pay one round of I/O latency
+            await asyncio.gather(
+                *(self.memory_manager.store_memory(
                     content=entry,
                     tags=['conversation_memory']
+                ) for entry in memory_entries),
+                self.memory_manager.store_memory(
+                    content=message.text,
+                    tags=['user_message']
                 )
-            
-            # Store user message in memory
-            await self.memory_manager.store_memory(
-                content=message.text,
-                tags=['user_message']
             )
             
             # Update context with processed response
@@ -207,6 +220,11 @@ class TelegramBot:
     async def start(self):
         """Start the bot."""
         try:
+            # Eager tasks (3.12+) run new coroutines synchronously until their
+            # first suspension, skipping an event-loop pass per task
+            if hasattr(asyncio, 'eager_task_factory'):
+                asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
             logger.info("Starting Telegram bot...")
             await self.dp.start_polling(self.bot)
         except Exception as e:
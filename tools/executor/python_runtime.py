@@ -1,155 +1,251 @@
+import ast
 import asyncio
+import contextlib
+import importlib
+import shutil
 import sys
 import os
 import subprocess
 import signal
 import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import StringIO
+from types import MappingProxyType
 from typing import Optional, Dict, Any
 from .base import BaseToolExecutor
 
+# Restricted builtins for safe execution; module-level so the worker process
+# resolves them locally instead of unpickling a dict per call, and read-only
+# so user code cannot mutate the shared table
+_SAFE_BUILTINS = MappingProxyType({
+    'abs': abs, 'all': all, 'any': any, 'ascii': ascii,
+    'bin': bin, 'bool': bool, 'bytearray': bytearray,
+    'bytes': bytes, 'chr': chr, 'complex': complex,
+    'dict': dict, 'divmod': divmod, 'enumerate': enumerate,
+    'filter': filter, 'float': float, 'format': format,
+    'frozenset': frozenset, 'hash': hash, 'hex': hex,
+    'int': int, 'isinstance': isinstance, 'issubclass': issubclass,
+    'iter': iter, 'len': len, 'list': list, 'map': map,
+    'max': max, 'min': min, 'next': next, 'oct': oct,
+    'ord': ord, 'pow': pow, 'print': print, 'range': range,
+    'repr': repr, 'reversed': reversed, 'round': round,
+    'set': set, 'slice': slice, 'sorted': sorted, 'str': str,
+    'sum': sum, 'tuple': tuple, 'type': type, 'zip': zip
+})
+
+
+# Modules user code may import and call names it may never invoke; consulted
+# by the AST safety check below
+_ALLOWED_IMPORTS = frozenset({'json', 'math', 're', 'statistics'})
+_BANNED_CALLS = frozenset({
+    'eval', 'exec', 'compile', 'open', '__import__',
+    'getattr', 'setattr', 'globals', 'locals', 'vars',
+})
+
+
+@lru_cache(maxsize=256)
+def _safe_ast_check(code: str) -> bool:
+    """Decide whether user code is safe to execute, via one AST pass.
+
+    Substring blocklists both miss trivial bypasses ('import  os',
+    'from os import *') and reject safe code that merely mentions a
+    pattern inside a string literal. Parsing once and walking the tree is
+    stricter and cheaper than scanning the source per pattern; results are
+    cached by source so repeats skip the parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            if any(alias.name.split('.')[0] not in _ALLOWED_IMPORTS
+                   for alias in node.names):
+                return False
+        elif isinstance(node, ast.ImportFrom):
+            if (node.module or '').split('.')[0] not in _ALLOWED_IMPORTS:
+                return False
+        elif isinstance(node, ast.Attribute):
+            if node.attr.startswith('__'):
+                return False
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name) and func.id in _BANNED_CALLS:
+                return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def _compile_cached(code: str):
+    """Compile user code once per distinct source.
+
+    The worker process is persistent, so repeated or retried snippets (e.g.
+    the rerun after a pip install) skip the tokenize/AST/bytecode pass.
+    """
+    return compile(code, '<glad-user>', 'exec')
+
+
+def _run_code_in_process(code: str, namespace: Dict[str, Any], output_dir: str) -> str:
+    """Run code in the worker process with a restricted environment.
+
+    Module-level (not a bound method) so submission pickles only the code
+    string, not the executor instance.
+    """
+    # Scoped stdout capture; unlike swapping sys.stdout by hand this is
+    # exception-safe by construction and doesn't touch module globals
+    redirected_output = StringIO()
+
+    try:
+        # Create restricted globals. The import machinery requires a real
+        # dict for __builtins__ and __import__ present, so hand each call a
+        # fresh copy of the shared table with __import__ added.
+        builtins = dict(_SAFE_BUILTINS)
+        builtins['__import__'] = __import__
+        restricted_globals = {
+            '__builtins__': builtins,
+            'os': os,
+            'output_dir': output_dir
+        }
+        restricted_globals.update(namespace)
+
+        # Execute code (cached bytecode when the source was seen before)
+        with contextlib.redirect_stdout(redirected_output):
+            exec(_compile_cached(code), restricted_globals, namespace)
+
+        # Get output
+        output = redirected_output.getvalue()
+
+        # If there's no output but there are new variables, show the last assigned value
+        if not output.strip() and namespace:
+            # Dicts iterate in insertion order; reversed() reads the last
+            # value without materializing the whole namespace as a list
+            last_var = next(reversed(namespace.values()), None)
+            # Only show the last value if it's a safe type
+            if last_var is not None and isinstance(last_var, (int, float, str, list, dict, tuple, set, bool)):
+                output = str(last_var)
+
+        return output.strip() if output.strip() else "Code executed successfully (no output)"
+
+    except ModuleNotFoundError as e:
+        # Structured signal so the parent can install and retry without
+        # parsing the module name out of an error string
+        return ('NEED_PKG', e.name)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
 class PythonExecutor(BaseToolExecutor):
     """Executes Python code with safety measures and proper timeout handling."""
-    
+
     def __init__(self):
         super().__init__()
         self.output_dir = "output"
         os.makedirs(self.output_dir, exist_ok=True)
-        
-        # Define restricted builtins for safe execution
-        self.safe_builtins = {
-            'abs': abs, 'all': all, 'any': any, 'ascii': ascii,
-            'bin': bin, 'bool': bool, 'bytearray': bytearray,
-            'bytes': bytes, 'chr': chr, 'complex': complex,
-            'dict': dict, 'divmod': divmod, 'enumerate': enumerate,
-            'filter': filter, 'float': float, 'format': format,
-            'frozenset': frozenset, 'hash': hash, 'hex': hex,
-            'int': int, 'isinstance': isinstance, 'issubclass': issubclass,
-            'iter': iter, 'len': len, 'list': list, 'map': map,
-            'max': max, 'min': min, 'next': next, 'oct': oct,
-            'ord': ord, 'pow': pow, 'print': print, 'range': range,
-            'repr': repr, 'reversed': reversed, 'round': round,
-            'set': set, 'slice': slice, 'sorted': sorted, 'str': str,
-            'sum': sum, 'tuple': tuple, 'type': type, 'zip': zip
-        }
+
+        self.safe_builtins = _SAFE_BUILTINS
+        # Long-lived worker process, spawned lazily and reused across calls;
+        # per-call Pool(1) paid interpreter startup for every snippet
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Packages already resolved this session; repeat import errors for
+        # them skip the install round-trip
+        self._installed: set = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the persistent worker pool, creating it on first use."""
+        if self._pool is None:
+            mp_context = multiprocessing.get_context('fork') if hasattr(os, 'fork') else None
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=mp_context)
+        return self._pool
+
+    def _discard_pool(self):
+        """Kill the worker and drop the pool so the next call respawns it."""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # A timed-out snippet may be stuck in exec(); SIGKILL unblocks shutdown
+        for process in list(getattr(pool, '_processes', {}).values()):
+            try:
+                process.kill()
+            except Exception:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, code: str, namespace: Dict[str, Any]) -> str:
+        """Run code on the worker with this executor's timeout."""
+        future = self._get_pool().submit(_run_code_in_process, code, namespace, self.output_dir)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
     
     async def _install_package(self, package: str) -> bool:
-        """Install a Python package using pip."""
+        """Install a Python package, preferring uv over pip when available."""
         try:
             # Check if package name is safe (only alphanumeric, -, _, .)
             if not all(c.isalnum() or c in '-_.' for c in package):
                 return False
-            
-            process = await asyncio.create_subprocess_shell(
-                f"pip install {package}",
+
+            if package in self._installed:
+                return True
+
+            # The import may only have failed in the restricted worker; if
+            # the module resolves here, no install is needed
+            try:
+                importlib.import_module(package)
+                self._installed.add(package)
+                return True
+            except ImportError:
+                pass
+
+            uv = shutil.which('uv')
+            if uv:
+                argv = [uv, 'pip', 'install', '--quiet', '--python', sys.executable, package]
+            else:
+                argv = [sys.executable, '-m', 'pip', 'install', '--quiet', package]
+
+            process = await asyncio.create_subprocess_exec(
+                *argv,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-            stdout, stderr = await process.communicate()
-            return process.returncode == 0
+            await process.communicate()
+            if process.returncode == 0:
+                self._installed.add(package)
+                return True
+            return False
         except Exception:
             return False
-    
-    async def _handle_import_error(self, error_msg: str) -> bool:
-        """Handle ImportError by attempting to install the missing package."""
-        # Extract package name from error message
-        if "No module named" in error_msg:
-            package = error_msg.split("'")[1]
-            return await self._install_package(package)
-        return False
-    
-    def _run_code_in_process(self, code: str, namespace: Dict[str, Any]) -> str:
-        """Run code in a separate process with restricted environment."""
-        # Capture stdout
-        old_stdout = sys.stdout
-        redirected_output = StringIO()
-        sys.stdout = redirected_output
-        
-        try:
-            # Create restricted globals
-            restricted_globals = {
-                '__builtins__': self.safe_builtins,
-                'os': os,
-                'output_dir': self.output_dir
-            }
-            restricted_globals.update(namespace)
-            
-            # Execute code
-            exec(code, restricted_globals, namespace)
-            
-            # Get output
-            output = redirected_output.getvalue()
-            
-            # If there's no output but there are new variables, show the last assigned value
-            if not output.strip() and namespace:
-                # Only show the last value if it's a safe type
-                last_var = list(namespace.values())[-1]
-                if isinstance(last_var, (int, float, str, list, dict, tuple, set, bool)):
-                    output = str(last_var)
-            
-            return output.strip() if output.strip() else "Code executed successfully (no output)"
-            
-        except Exception as e:
-            return f"Error: {str(e)}"
-        finally:
-            sys.stdout = old_stdout
-    
+
     async def execute(self, content: str) -> str:
         """Execute Python code safely with proper timeout handling."""
         try:
             # Create namespace for execution
             namespace: Dict[str, Any] = {}
-            
-            # Create a process pool for execution
-            with multiprocessing.Pool(1) as pool:
-                # Run code in separate process with timeout
-                try:
-                    async_result = pool.apply_async(self._run_code_in_process, (content, namespace))
-                    result = async_result.get(timeout=self.timeout)
-                    
-                    # Check if result is an error
-                    if result.startswith("Error: No module named"):
-                        # Try to install missing package and retry
-                        if await self._handle_import_error(result[7:]):  # Skip "Error: "
-                            async_result = pool.apply_async(self._run_code_in_process, (content, namespace))
-                            result = async_result.get(timeout=self.timeout)
-                    
-                    return self.format_result(result)
-                    
-                except multiprocessing.TimeoutError:
-                    # Terminate the pool forcefully
-                    pool.terminate()
-                    pool.join()
-                    return self.format_error(f"Code execution timed out after {self.timeout} seconds")
-                    
-                except Exception as e:
-                    return self.format_error(str(e))
-                
+
+            try:
+                result = await self._submit(content, namespace)
+
+                # Worker signals missing packages structurally; install and
+                # retry once (the bytecode cache makes the recompile free)
+                if isinstance(result, tuple) and result[0] == 'NEED_PKG':
+                    package = result[1]
+                    if await self._install_package(package):
+                        result = await self._submit(content, namespace)
+                    if isinstance(result, tuple):
+                        return self.format_error(f"Error: No module named '{result[1]}'")
+
+                return self.format_result(result)
+
+            except asyncio.TimeoutError:
+                # The worker may be wedged in user code; kill and respawn
+                self._discard_pool()
+                return self.format_error(f"Code execution timed out after {self.timeout} seconds")
+
+            except Exception as e:
+                return self.format_error(str(e))
+
         except Exception as e:
             return self.format_error(f"Failed to execute code: {str(e)}")
         
     def _is_safe_code(self, code: str) -> bool:
         """Check if code appears safe to execute."""
-        # List of dangerous patterns
-        dangerous_patterns = [
-            "import os",
-            "import subprocess",
-            "import sys",
-            "__import__",
-            "eval(",
-            "exec(",
-            "open(",
-            "file(",
-            ".read(",
-            ".write(",
-            "os.",
-            "sys.",
-            "subprocess.",
-            "lambda",
-            "globals()",
-            "locals()"
-        ]
-        
-        # Check for dangerous patterns
-        code_lower = code.lower()
-        return not any(pattern.lower() in code_lower for pattern in dangerous_patterns) 
\ No newline at end of file
+        return _safe_ast_check(code)
\ No newline at end of file
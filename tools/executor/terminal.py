@@ -1,53 +1,77 @@
 import asyncio
+import codecs
 import os
+import re
+import shlex
 import signal
+from types import MappingProxyType
 from typing import List, Optional
 from .base import BaseToolExecutor
 
+# Bounds for draining command output: read in fixed-size chunks and abort
+# commands whose output would otherwise exhaust memory
+_READ_CHUNK = 65536
+_MAX_OUTPUT_BYTES = 10 * 1024 * 1024
+
+# Allowed commands with their permitted options; built once at import as
+# read-only frozensets so option checks are O(1) hash lookups and instances
+# share one table instead of rebuilding it per __init__
+_ALLOWED_COMMANDS = MappingProxyType({
+    'ls': frozenset({'-l', '-a', '-h', '-t', '-r', '--help'}),
+    'cat': frozenset({'--help'}),
+    'grep': frozenset({'-i', '-n', '-r', '-l', '--help'}),
+    'pwd': frozenset({'--help'}),
+    'echo': frozenset(),  # echo is safe with any args
+    'head': frozenset({'-n', '--help'}),
+    'tail': frozenset({'-n', '--help'}),
+    'wc': frozenset({'-l', '-w', '-c', '--help'}),
+    'find': frozenset({'-name', '-type', '-size', '--help'}),
+    'sort': frozenset({'-n', '-r', '--help'}),
+    'uniq': frozenset({'-c', '-d', '-u', '--help'}),
+    'date': frozenset({'--help'}),
+    'df': frozenset({'-h', '--help'}),
+    'du': frozenset({'-h', '-s', '--help'}),
+    'ps': frozenset({'aux', '-ef', '--help'}),
+})
+
+_DANGEROUS_PATTERNS = (
+    ';', '&&', '||', '|',  # Command chaining
+    '>', '>>', '<',        # Redirection
+    '`', '$(',             # Command substitution
+    'rm', 'mv', 'cp',      # File operations
+    'chmod', 'chown',      # Permission changes
+    'sudo', 'su',          # Privilege escalation
+    'wget', 'curl',        # Network access
+    'ssh', 'ftp',          # Remote access
+    'kill', 'pkill',       # Process management
+    'dd', 'mkfs',          # Disk operations
+    'mount', 'umount',     # Mount operations
+    'apt', 'yum', 'brew',  # Package management
+)
+
+# One compiled alternation so the safety check scans the command in a
+# single pass instead of once per pattern
+_DANGER_RE = re.compile('|'.join(re.escape(p) for p in _DANGEROUS_PATTERNS))
+
+
 class TerminalExecutor(BaseToolExecutor):
     """Executes terminal commands with safety measures."""
-    
+
     def __init__(self):
         super().__init__()
-        # Define allowed commands and their options
-        self.allowed_commands = {
-            'ls': ['-l', '-a', '-h', '-t', '-r', '--help'],
-            'cat': ['--help'],
-            'grep': ['-i', '-n', '-r', '-l', '--help'],
-            'pwd': ['--help'],
-            'echo': [],  # echo is safe with any args
-            'head': ['-n', '--help'],
-            'tail': ['-n', '--help'],
-            'wc': ['-l', '-w', '-c', '--help'],
-            'find': ['-name', '-type', '-size', '--help'],
-            'sort': ['-n', '-r', '--help'],
-            'uniq': ['-c', '-d', '-u', '--help'],
-            'date': ['--help'],
-            'df': ['-h', '--help'],
-            'du': ['-h', '-s', '--help'],
-            'ps': ['aux', '-ef', '--help']
-        }
-        
-        # Define dangerous patterns
-        self.dangerous_patterns = [
-            ';', '&&', '||', '|',  # Command chaining
-            '>', '>>', '<',        # Redirection
-            '`', '$(',             # Command substitution
-            'rm', 'mv', 'cp',      # File operations
-            'chmod', 'chown',      # Permission changes
-            'sudo', 'su',          # Privilege escalation
-            'wget', 'curl',        # Network access
-            'ssh', 'ftp',          # Remote access
-            'kill', 'pkill',       # Process management
-            'dd', 'mkfs',          # Disk operations
-            'mount', 'umount',     # Mount operations
-            'apt', 'yum', 'brew'   # Package management
-        ]
+        # Shared read-only tables; kept as attributes for existing callers
+        self.allowed_commands = _ALLOWED_COMMANDS
+        self.dangerous_patterns = _DANGEROUS_PATTERNS
+        self._danger_re = _DANGER_RE
     
     def _is_safe_command(self, command: str) -> bool:
         """Check if a command is safe to execute."""
-        # Split command and arguments
-        parts = command.strip().split()
+        # Tokenize the way the command will actually be executed, so quoted
+        # arguments are treated as single tokens
+        try:
+            parts = shlex.split(command)
+        except ValueError:
+            return False  # Unbalanced quotes
         if not parts:
             return False
         
@@ -59,19 +83,18 @@ class TerminalExecutor(BaseToolExecutor):
             return False
         
         # Check for dangerous patterns
-        if any(pattern in command for pattern in self.dangerous_patterns):
+        if self._danger_re.search(command):
             return False
         
-        # If command has arguments, check if they're allowed
-        if len(parts) > 1:
-            allowed_options = self.allowed_commands[base_cmd]
-            if allowed_options:  # If empty list, all options are allowed (e.g., echo)
-                for arg in parts[1:]:
-                    # Skip file/directory arguments
-                    if arg.startswith('-'):
-                        if arg not in allowed_options:
-                            return False
-        
+        # If command has arguments, check if they're allowed; non-option
+        # arguments (files, directories) pass through
+        allowed_options = self.allowed_commands[base_cmd]
+        if allowed_options:  # If empty set, all options are allowed (e.g., echo)
+            return all(
+                not arg.startswith('-') or arg in allowed_options
+                for arg in parts[1:]
+            )
+
         return True
     
     async def execute(self, content: str) -> str:
@@ -84,42 +107,87 @@ class TerminalExecutor(BaseToolExecutor):
                     "Only basic file and text processing commands are permitted."
                 )
             
-            # Create subprocess with its own process group
-            process = await asyncio.create_subprocess_shell(
-                content,
+            # Execute the argv directly — the safety check forbids shell
+            # metacharacters anyway, so spawning /bin/sh would only add a
+            # fork+exec and a parser pass per command
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(content),
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 preexec_fn=os.setsid  # Create new process group
             )
             
             try:
-                # Wait for process with timeout
+                # Drain both streams in bounded chunks with timeout;
+                # communicate() would buffer arbitrary output in memory
                 stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                    self._collect_output(process),
                     timeout=self.timeout
                 )
-                
+
                 # Check return code and return appropriate output
                 if process.returncode == 0:
-                    output = stdout.decode().strip()
+                    # Right-strip only: leading whitespace is meaningful in
+                    # command output (indentation, column alignment)
+                    output = stdout.rstrip()
                     if not output:
                         return self.format_result("Command executed successfully (no output)")
                     return self.format_result(output)
                 else:
-                    return self.format_error(stderr.decode().strip())
-                    
+                    return self.format_error(stderr.strip())
+
+            except ValueError:
+                self._kill_process_group(process)
+                return self.format_error(
+                    f"Command output exceeded {_MAX_OUTPUT_BYTES // (1024 * 1024)} MB and was aborted"
+                )
+
             except asyncio.TimeoutError:
                 # Kill the entire process group
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                except ProcessLookupError:
-                    pass  # Process already terminated
-                
+                self._kill_process_group(process)
                 return self.format_error(f"Command timed out after {self.timeout} seconds")
                 
         except Exception as e:
             return self.format_error(f"Failed to execute command: {str(e)}")
     
+    @staticmethod
+    def _kill_process_group(process):
+        """Terminate the command's whole process group, ignoring races."""
+        try:
+            os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+        except ProcessLookupError:
+            pass  # Process already terminated
+
+    async def _collect_output(self, process):
+        """Drain stdout and stderr concurrently, then reap the process."""
+        stdout, stderr = await asyncio.gather(
+            self._drain(process.stdout),
+            self._drain(process.stderr)
+        )
+        await process.wait()
+        return stdout, stderr
+
+    @staticmethod
+    async def _drain(stream) -> str:
+        """Read a stream in bounded chunks, decoding incrementally.
+
+        Raises ValueError once the running total passes _MAX_OUTPUT_BYTES so
+        callers can abort the command instead of buffering its full output.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        parts = []
+        total = 0
+        while True:
+            chunk = await stream.read(_READ_CHUNK)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > _MAX_OUTPUT_BYTES:
+                raise ValueError("command output too large")
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', True))
+        return ''.join(parts)
+
     def get_allowed_commands(self) -> List[str]:
         """Return list of allowed commands."""
         return list(self.allowed_commands.keys()) 
\ No newline at end of file
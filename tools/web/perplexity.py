@@ -1,9 +1,10 @@
 import os
 import time
-import json
 import asyncio
+from collections import OrderedDict, deque
 from typing import Dict, Optional
 from openai import OpenAI, AsyncOpenAI
+from system.config import load_config
 from ..executor.base import BaseToolExecutor
 import logging
 
@@ -14,44 +15,63 @@ class PerplexityExecutor(BaseToolExecutor):
     
     def __init__(self):
         super().__init__()
-        # Load config
-        with open('config/config.json', 'r') as f:
-            config = json.load(f)['system']['tools']['perplexity']
-            
+        # Load config (shared cached parse; no disk I/O after the first load)
+        config = load_config()['tools']['perplexity']
+
+
         self.timeout = config['max_execution_time']
         self.api_key = os.getenv('PERPLEXITY_API_KEY')
         self.model = config.get('model', 'sonar-pro')
         self.max_tokens = config.get('max_tokens', 300)
         self.temperature = config.get('temperature', 0.7)
-        
-        # Initialize OpenAI client
+
+        # Pooled HTTP/2 transport: keep-alive skips the TLS handshake per
+        # call and concurrent queries multiplex over one connection
+        import httpx
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=self.timeout
+        )
+
+        # Initialize OpenAI client on the shared transport
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url="https://api.perplexity.ai",
-            timeout=self.timeout
+            timeout=self.timeout,
+            http_client=self._http
         )
         
         # Rate limiting settings
         self.requests_per_minute = 10
         self.min_request_interval = 60 / self.requests_per_minute
         self.last_request_time = 0
-        self.request_times = []
+        # Sliding window of request timestamps; old entries pop off the left
+        self.request_times: 'deque[float]' = deque()
         
         # Error handling settings
         self.max_retries = 3
         self.retry_delay = 1  # seconds
         
-        # Cache settings
-        self.cache: Dict[str, Dict] = {}
+        # Cache settings. TTL is constant, so insertion order == expiry
+        # order and eviction can pop stale heads instead of scanning.
+        self.cache: 'OrderedDict[str, tuple]' = OrderedDict()
         self.cache_ttl = 300  # 5 minutes
+        self.cache_max_entries = 256
+
+        # Queries currently on the wire; duplicate callers await the first
+        # caller's future instead of spending another rate-limited request
+        self._in_flight: Dict[str, asyncio.Future] = {}
     
-    async def _wait_for_rate_limit(self):
+    async def _wait_for_rate_limit(self, now: Optional[float] = None):
         """Wait if necessary to comply with rate limits."""
-        current_time = time.time()
-        
-        # Clean up old request times
-        self.request_times = [t for t in self.request_times 
-                            if current_time - t < 60]
+        # Monotonic clock: immune to wall-clock steps, which would otherwise
+        # let the limiter over- or under-throttle
+        current_time = time.monotonic() if now is None else now
+
+        # Clean up old request times — amortized O(1), no list rebuild
+        while self.request_times and current_time - self.request_times[0] >= 60:
+            self.request_times.popleft()
         
         # Check if we've hit the rate limit
         if len(self.request_times) >= self.requests_per_minute:
@@ -65,26 +85,34 @@ class PerplexityExecutor(BaseToolExecutor):
         if time_since_last < self.min_request_interval:
             await asyncio.sleep(self.min_request_interval - time_since_last)
     
-    def _get_cached_result(self, query: str) -> Optional[Dict]:
+    def _get_cached_result(self, query: str, now: Optional[float] = None) -> Optional[Dict]:
         """Get cached result if available and not expired."""
-        if query in self.cache:
-            cache_time, result = self.cache[query]
-            if time.time() - cache_time < self.cache_ttl:
+        entry = self.cache.get(query)
+        if entry is not None:
+            cache_time, result = entry
+            if (time.monotonic() if now is None else now) - cache_time < self.cache_ttl:
                 return result
-            else:
-                del self.cache[query]
+            del self.cache[query]
         return None
-    
-    def _cache_result(self, query: str, result: Dict):
+
+    def _cache_result(self, query: str, result: Dict, now: Optional[float] = None):
         """Cache a search result."""
-        self.cache[query] = (time.time(), result)
-        
-        # Clean up old cache entries
-        current_time = time.time()
-        expired_keys = [k for k, (t, _) in self.cache.items()
-                       if current_time - t > self.cache_ttl]
-        for k in expired_keys:
-            del self.cache[k]
+        current_time = time.monotonic() if now is None else now
+        self.cache[query] = (current_time, result)
+        self.cache.move_to_end(query)
+
+        # The oldest entry is always at the front, so eviction pops expired
+        # heads until a fresh one appears — O(expired), not O(cache)
+        while self.cache:
+            oldest_time, _ = next(iter(self.cache.values()))
+            if current_time - oldest_time > self.cache_ttl:
+                self.cache.popitem(last=False)
+            else:
+                break
+
+        # Bound total size regardless of TTL
+        while len(self.cache) > self.cache_max_entries:
+            self.cache.popitem(last=False)
     
     async def execute(self, content: str) -> str:
         """Execute Perplexity search with rate limiting and caching."""
@@ -93,13 +121,33 @@ class PerplexityExecutor(BaseToolExecutor):
         if not self.api_key:
             return "<result>Perplexity API key not configured. Please set the PERPLEXITY_API_KEY environment variable.</result>"
         
-        # Check cache first
-        cached_result = self._get_cached_result(content)
+        # Check cache first (one clock read reused for the whole lookup)
+        now = time.monotonic()
+        cached_result = self._get_cached_result(content, now)
         if cached_result:
             formatted = self._format_result(cached_result)
-            logger.info(f"Returning cached result: {formatted}")
+            logger.debug("Returning cached result: %s", formatted)
             return formatted
-        
+
+        # Coalesce concurrent duplicates onto one request
+        existing = self._in_flight.get(content)
+        if existing is not None:
+            return await existing
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[content] = future
+        try:
+            result = await self._do_search(content)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._in_flight[content]
+
+    async def _do_search(self, content: str) -> str:
+        """Run the rate-limited search with retries; returns the formatted result."""
         # Initialize retry counter
         retries = 0
         last_error = None
@@ -124,8 +172,9 @@ class PerplexityExecutor(BaseToolExecutor):
                 # Wait for rate limit
                 await self._wait_for_rate_limit()
                 
-                # Update request tracking
-                current_time = time.time()
+                # Update request tracking. Re-read the clock here: the rate
+                # limiter may have slept, so an entry timestamp must be fresh
+                current_time = time.monotonic()
                 self.last_request_time = current_time
                 self.request_times.append(current_time)
                 
@@ -145,9 +194,9 @@ class PerplexityExecutor(BaseToolExecutor):
                     }
                     
                     # Cache successful result
-                    self._cache_result(content, result)
+                    self._cache_result(content, result, time.monotonic())
                     formatted = self._format_result(result)
-                    logger.info(f"Returning result: {formatted}")
+                    logger.debug("Returning result: %s", formatted)
                     return formatted
                 else:
                     last_error = "No response content received"
@@ -163,30 +212,35 @@ class PerplexityExecutor(BaseToolExecutor):
         
         return f"<result>Search failed after {retries} attempts. Last error: {last_error}</result>"
     
+    async def close(self):
+        """Release the pooled HTTP connection on shutdown."""
+        await self._http.aclose()
+
     def _format_result(self, result: dict) -> str:
         """Format the search results into a readable string."""
-        logger.info(f"Formatting result: {result}")
+        logger.debug("Formatting result: %s", result)
         try:
             answer = result.get('answer', '').strip()
             sources = result.get('sources', [])
-            
+
             if not answer:
                 logger.warning("No answer found in result")
                 return "No answer found for the query."
-            
-            formatted = f"{answer}\n\n"
-            logger.info(f"Formatted result: {formatted}")
-            
+
+            # Accumulate segments and join once; += rebuilds the string on
+            # every source line
+            parts = [answer, "\n\n"]
+
             if sources:
-                formatted += "Sources:\n"
+                parts.append("Sources:\n")
                 for i, source in enumerate(sources[:5], 1):  # Limit to top 5 sources
                     title = source.get('title', 'Untitled').strip()
                     url = source.get('url', 'No URL').strip()
                     if title and url:
-                        formatted += f"{i}. {title}\n   {url}\n"
-            
-            return formatted
-            
+                        parts.append(f"{i}. {title}\n   {url}\n")
+
+            return ''.join(parts)
+
         except Exception as e:
             return f"Error formatting results: {str(e)}"
 